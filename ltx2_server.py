@@ -6,24 +6,53 @@ Runs on port 8001, served via Tailscale at https://gamma.tail5f2bae.ts.net:8001
 """
 
 import os
-import uuid
+import json
+import time
+import shutil
+import secrets
+import sqlite3
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
 
 # Configuration
 MODEL_ROOT = Path(os.getenv("LTX2_MODEL_ROOT", "/home/arthurdell/models/ltx2"))
 GEMMA_ROOT = Path(os.getenv("LTX2_GEMMA_ROOT", "/home/arthurdell/models/ltx2"))
 OUTPUT_DIR = Path("/home/arthurdell/ltx2_outputs")
+JOBS_DB = Path(os.getenv("LTX2_JOBS_DB", str(OUTPUT_DIR / "jobs.db")))
 HOST = "0.0.0.0"
 PORT = 8001
+MAX_UPLOAD_BYTES = int(os.getenv("LTX2_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+# Internal nginx location aliased to OUTPUT_DIR (e.g. "/internal/"); when set,
+# downloads are handed off to nginx via X-Accel-Redirect. Normalized to a single
+# trailing slash so "/internal" doesn't yield "/internalabc.mp4"
+ACCEL_REDIRECT_PREFIX = os.getenv("LTX2_ACCEL_REDIRECT", "").rstrip("/")
+ACCEL_REDIRECT_PREFIX = f"{ACCEL_REDIRECT_PREFIX}/" if ACCEL_REDIRECT_PREFIX else ""
+
+# FP8 E4M3 compute for the transformer's Linear layers (requires torchao)
+FP8_ENABLED = os.getenv("LTX2_FP8", "0") == "1"
+# Comma-separated module name suffixes kept in BF16 for accuracy
+FP8_SKIP_MODULES = [m for m in os.getenv("LTX2_FP8_SKIP", "proj_out").split(",") if m]
+# torch.compile the transformer, specialized to the default request shape
+COMPILE_ENABLED = os.getenv("LTX2_COMPILE", "1") == "1"
+# Capture the compiled transformer's forward as CUDA graphs (requires LTX2_COMPILE)
+CUDA_GRAPHS_ENABLED = os.getenv("LTX2_CUDA_GRAPHS", "1") == "1"
+# Run a short generation before accepting traffic
+WARMUP_ENABLED = os.getenv("LTX2_WARMUP", "1") == "1"
+# VAE decode tiling (spatial in pixels, temporal in frames)
+VAE_TILE = int(os.getenv("LTX2_VAE_TILE", "256"))
+VAE_OVERLAP = int(os.getenv("LTX2_VAE_OVERLAP", "64"))
+VAE_TEMPORAL_TILE = int(os.getenv("LTX2_VAE_TEMPORAL_TILE", "24"))
+VAE_TEMPORAL_OVERLAP = int(os.getenv("LTX2_VAE_TEMPORAL_OVERLAP", "8"))
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -31,14 +60,232 @@ logger = logging.getLogger(__name__)
 
 # Global pipeline (initialized on startup)
 pipeline = None
-jobs = {}
+transformer_compiled = False
 executor = ThreadPoolExecutor(max_workers=1)
 
+# Job registry (SQLite, opened on startup)
+db = None
+db_lock = threading.Lock()
+JOB_ID_ATTEMPTS = 5
+MAX_LIST_JOBS = 500
+
+
+def open_job_store():
+    """Open the SQLite job registry and fail jobs interrupted by a restart."""
+    global db
+    JOBS_DB.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(JOBS_DB), check_same_thread=False)
+    db.row_factory = sqlite3.Row
+
+    with db_lock, db:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                request_json TEXT,
+                output_path TEXT,
+                input_image TEXT,
+                error TEXT
+            )"""
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)")
+        interrupted = db.execute(
+            "UPDATE jobs SET status = 'failed', error = ? WHERE status IN ('pending', 'processing')",
+            ("Interrupted by server restart",),
+        ).rowcount
+
+    if interrupted:
+        logger.warning(f"Marked {interrupted} interrupted job(s) as failed")
+
+
+def create_job(**fields):
+    """Insert a pending job under a fresh random id and return the id.
+
+    Ids are 8 hex chars, so collisions are possible over a long history;
+    the primary key rejects them and a new id is drawn.
+    """
+    fields = {"status": "pending", "created_at": time.time(), **fields}
+    columns = ", ".join(["job_id", *fields])
+    placeholders = ", ".join("?" for _ in range(len(fields) + 1))
+
+    for _ in range(JOB_ID_ATTEMPTS):
+        job_id = secrets.token_hex(4)
+        try:
+            with db_lock, db:
+                db.execute(
+                    f"INSERT INTO jobs ({columns}) VALUES ({placeholders})",
+                    [job_id, *fields.values()],
+                )
+            return job_id
+        except sqlite3.IntegrityError:
+            logger.warning(f"Job id collision on {job_id}, retrying")
+    raise RuntimeError(f"Could not allocate a unique job id after {JOB_ID_ATTEMPTS} attempts")
+
+
+def update_job(job_id, **fields):
+    """Update the given columns of an existing job."""
+    assignments = ", ".join(f"{col} = ?" for col in fields)
+    with db_lock, db:
+        db.execute(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+            [*fields.values(), job_id],
+        )
+
+
+def get_job(job_id):
+    """Fetch a job as a dict, or None if it does not exist."""
+    with db_lock:
+        row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def get_transformer(pipeline):
+    """Return the pipeline's diffusion transformer, or None if not exposed."""
+    transformer = getattr(pipeline, "transformer", None)
+    if transformer is None:
+        logger.warning("Pipeline does not expose a transformer module")
+    return transformer
+
+
+def enable_fp8(transformer):
+    """Quantize the transformer's Linear layers to FP8 E4M3 with FP32 accumulation."""
+    import torch
+
+    try:
+        from torchao.quantization import (
+            Float8DynamicActivationFloat8WeightConfig,
+            PerRow,
+            quantize_,
+        )
+    except ImportError:
+        logger.warning("LTX2_FP8=1 but torchao is not installed; running in BF16")
+        return
+
+    # Keep matmul accumulation in FP32
+    torch.backends.cuda.matmul.allow_fp16_reduced_precision_reduction = False
+    torch.backends.cuda.matmul.allow_bf16_reduced_precision_reduction = False
+
+    def should_quantize(module, fqn):
+        if not isinstance(module, torch.nn.Linear):
+            return False
+        return not any(fqn.endswith(name) for name in FP8_SKIP_MODULES)
+
+    quantize_(
+        transformer,
+        Float8DynamicActivationFloat8WeightConfig(granularity=PerRow()),
+        filter_fn=should_quantize,
+    )
+    logger.info(f"FP8 quantization enabled (BF16 fallback: {', '.join(FP8_SKIP_MODULES) or 'none'})")
+
+
+def compile_transformer(pipeline):
+    """Replace the pipeline's transformer with a fullgraph torch.compile'd version.
+
+    With CUDA graphs enabled, Inductor captures each static-shape forward once
+    and replays it on every denoising step, removing per-kernel launch overhead.
+    Its graph trees are thread-local, so capture must happen on the executor
+    thread that runs jobs.
+    """
+    import torch
+
+    transformer = get_transformer(pipeline)
+    if transformer is None:
+        return False
+
+    mode = "max-autotune" if CUDA_GRAPHS_ENABLED else "max-autotune-no-cudagraphs"
+
+    pipeline.transformer = torch.compile(
+        transformer,
+        mode=mode,
+        fullgraph=True,
+        dynamic=False,
+    )
+    logger.info(f"Transformer compiled (mode={mode})")
+    return True
+
+
+def compile_stance(height, width, num_frames):
+    """Use the compiled transformer only for the warmed-up default shape.
+
+    Any other shape would trigger a fresh max-autotune compile and CUDA graph
+    capture on the job thread, so those calls run the transformer eagerly.
+    """
+    import torch
+
+    defaults = TextToVideoRequest(prompt="")
+    if not transformer_compiled or (height, width, num_frames) == (
+        defaults.height, defaults.width, defaults.num_frames
+    ):
+        return nullcontext()
+    return torch.compiler.set_stance("force_eager")
+
+
+def build_tiling_config():
+    """VAE tiling tuned to keep decode peak memory low."""
+    from ltx_core.model.video_vae import SpatialTilingConfig, TemporalTilingConfig, TilingConfig
+
+    return TilingConfig(
+        spatial_config=SpatialTilingConfig(
+            tile_size_in_pixels=VAE_TILE,
+            tile_overlap_in_pixels=VAE_OVERLAP,
+        ),
+        temporal_config=TemporalTilingConfig(
+            tile_size_in_frames=VAE_TEMPORAL_TILE,
+            tile_overlap_in_frames=VAE_TEMPORAL_OVERLAP,
+        ),
+    )
+
+
+def warmup_pipeline(compiled):
+    """Run a 2-step generation so kernel selection, autotuning and compilation
+    happen at startup instead of on the first job, and OOMs surface at boot.
+
+    A compiled transformer is specialized to static shapes, so it is warmed up
+    at the default request shape; otherwise a small shape is enough.
+    """
+    import torch
+
+    defaults = TextToVideoRequest(prompt="warmup")
+    height, width, num_frames = (
+        (defaults.height, defaults.width, defaults.num_frames) if compiled else (256, 384, 17)
+    )
+    logger.info(f"Warming up pipeline at {width}x{height}, {num_frames} frames")
+
+    with torch.inference_mode():
+        video, _ = pipeline(
+            prompt=defaults.prompt,
+            negative_prompt=defaults.negative_prompt,
+            seed=0,
+            height=height,
+            width=width,
+            num_frames=num_frames,
+            frame_rate=defaults.frame_rate,
+            num_inference_steps=2,
+            cfg_guidance_scale=defaults.cfg_guidance_scale,
+            images=[],
+            tiling_config=build_tiling_config(),
+        )
+
+    # Drain lazily decoded chunks so the VAE decoder is warmed up too
+    if not isinstance(video, torch.Tensor):
+        with torch.no_grad():
+            for _ in video:
+                pass
+
+    del video
+    torch.cuda.empty_cache()
+    logger.info("Warmup complete")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize LTX-2 pipeline on startup."""
-    global pipeline
+    global pipeline, transformer_compiled
+    open_job_store()
+
     logger.info(f"Loading LTX-2 pipeline from {MODEL_ROOT}")
 
     from ltx_pipelines.ti2vid_two_stages import TI2VidTwoStagesPipeline
@@ -60,6 +307,19 @@ async def lifespan(app: FastAPI):
         loras=[]
     )
 
+    import torch
+    torch.set_float32_matmul_precision("high")
+
+    if FP8_ENABLED:
+        transformer = get_transformer(pipeline)
+        if transformer is not None:
+            enable_fp8(transformer)
+
+    transformer_compiled = COMPILE_ENABLED and compile_transformer(pipeline)
+    if WARMUP_ENABLED:
+        # Warm up on the job thread so CUDA graphs are recorded where they replay
+        executor.submit(warmup_pipeline, transformer_compiled).result()
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     logger.info(f"LTX-2 pipeline ready. Output directory: {OUTPUT_DIR}")
     yield
@@ -82,6 +342,59 @@ app.add_middleware(
 )
 
 
+class UploadSizeLimitMiddleware:
+    """Reject request bodies larger than max_bytes with a 413.
+
+    Pure ASGI so responses (notably video downloads) pass straight through.
+    Content-Length is checked up front; chunked or header-less bodies are
+    counted as they are received, before the form parser spools them.
+    """
+
+    def __init__(self, app, max_bytes):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.detail = f"Upload exceeds {max_bytes // (1024 * 1024)}MB limit"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await JSONResponse(status_code=413, content={"detail": self.detail})(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPException from body parsing as-is
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            if e.status_code != 413 or response_started:
+                raise
+            await JSONResponse(status_code=413, content={"detail": self.detail})(scope, receive, send)
+
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES)
+
+
 # --- Models ---
 
 class TextToVideoRequest(BaseModel):
@@ -110,14 +423,18 @@ class JobStatus(BaseModel):
 async def health_check():
     """Health check endpoint."""
     import torch
+    with db_lock:
+        active_jobs, total_jobs = db.execute(
+            "SELECT COALESCE(SUM(status = 'processing'), 0), COUNT(*) FROM jobs"
+        ).fetchone()
     return {
         "status": "healthy",
         "model": "ltx-2-19b-dev-fp8",
         "pipeline_loaded": pipeline is not None,
         "cuda_available": torch.cuda.is_available(),
         "gpu": torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
-        "active_jobs": len([j for j in jobs.values() if j["status"] == "processing"]),
-        "total_jobs": len(jobs)
+        "active_jobs": active_jobs,
+        "total_jobs": total_jobs
     }
 
 
@@ -135,43 +452,40 @@ async def list_models():
 
 
 @app.post("/api/v1/text-to-video", response_model=JobStatus)
-async def text_to_video(request: TextToVideoRequest, background_tasks: BackgroundTasks):
+async def text_to_video(request: TextToVideoRequest):
     """Generate video from text prompt."""
     from ltx_pipelines.utils.media_io import encode_video
     from ltx_pipelines.utils.constants import AUDIO_SAMPLE_RATE
-    from ltx_core.model.video_vae import TilingConfig, get_video_chunks_number
+    from ltx_core.model.video_vae import get_video_chunks_number
 
-    job_id = str(uuid.uuid4())[:8]
+    job_id = create_job(request_json=json.dumps(request.model_dump()))
     output_path = OUTPUT_DIR / f"{job_id}.mp4"
-
-    jobs[job_id] = {
-        "status": "pending",
-        "output_path": str(output_path),
-        "request": request.model_dump()
-    }
+    update_job(job_id, output_path=str(output_path))
 
     def generate():
         import torch
         try:
             logger.info(f"[{job_id}] Starting generation: {request.prompt[:50]}...")
-            jobs[job_id]["status"] = "processing"
+            update_job(job_id, status="processing")
 
-            tiling_config = TilingConfig.default()
+            tiling_config = build_tiling_config()
             video_chunks_number = get_video_chunks_number(request.num_frames, tiling_config)
 
-            video, audio = pipeline(
-                prompt=request.prompt,
-                negative_prompt=request.negative_prompt,
-                seed=request.seed,
-                height=request.height,
-                width=request.width,
-                num_frames=request.num_frames,
-                frame_rate=request.frame_rate,
-                num_inference_steps=request.num_inference_steps,
-                cfg_guidance_scale=request.cfg_guidance_scale,
-                images=[],
-                tiling_config=tiling_config,
-            )
+            stance = compile_stance(request.height, request.width, request.num_frames)
+            with torch.inference_mode(), stance:
+                video, audio = pipeline(
+                    prompt=request.prompt,
+                    negative_prompt=request.negative_prompt,
+                    seed=request.seed,
+                    height=request.height,
+                    width=request.width,
+                    num_frames=request.num_frames,
+                    frame_rate=request.frame_rate,
+                    num_inference_steps=request.num_inference_steps,
+                    cfg_guidance_scale=request.cfg_guidance_scale,
+                    images=[],
+                    tiling_config=tiling_config,
+                )
 
             # Wrap encoding in no_grad to avoid inference_mode conflict with VAE decoder
             with torch.no_grad():
@@ -184,14 +498,13 @@ async def text_to_video(request: TextToVideoRequest, background_tasks: Backgroun
                     video_chunks_number=video_chunks_number,
                 )
 
-            jobs[job_id]["status"] = "completed"
+            update_job(job_id, status="completed")
             logger.info(f"[{job_id}] Generation completed: {output_path}")
         except Exception as e:
-            jobs[job_id]["status"] = "failed"
-            jobs[job_id]["error"] = str(e)
+            update_job(job_id, status="failed", error=str(e))
             logger.error(f"[{job_id}] Generation failed: {e}", exc_info=True)
 
-    background_tasks.add_task(lambda: executor.submit(generate).result())
+    executor.submit(generate)
     return JobStatus(job_id=job_id, status="pending")
 
 
@@ -201,50 +514,54 @@ async def image_to_video(
     negative_prompt: str = Form(""),
     num_frames: int = Form(121),
     seed: int = Form(42),
-    image: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None
+    image: UploadFile = File(...)
 ):
     """Generate video from image + text prompt."""
     from ltx_pipelines.utils.media_io import encode_video
     from ltx_pipelines.utils.constants import AUDIO_SAMPLE_RATE
-    from ltx_core.model.video_vae import TilingConfig, get_video_chunks_number
+    from ltx_core.model.video_vae import get_video_chunks_number
+
+    # Stream the upload to a temporary name in 1MB chunks rather than buffering
+    # it whole, and only allocate the job once it is safely on disk so a failed
+    # upload leaves no row behind. UploadSizeLimitMiddleware has already capped
+    # the body size.
+    upload_path = OUTPUT_DIR / f".upload_{secrets.token_hex(8)}.jpg"
+    try:
+        with open(upload_path, "wb") as f:
+            await run_in_threadpool(shutil.copyfileobj, image.file, f, 1 << 20)
+        job_id = create_job()
+    except Exception:
+        upload_path.unlink(missing_ok=True)
+        raise
 
-    job_id = str(uuid.uuid4())[:8]
     output_path = OUTPUT_DIR / f"{job_id}.mp4"
     image_path = OUTPUT_DIR / f"{job_id}_input.jpg"
-
-    contents = await image.read()
-    with open(image_path, "wb") as f:
-        f.write(contents)
-
-    jobs[job_id] = {
-        "status": "pending",
-        "output_path": str(output_path),
-        "input_image": str(image_path)
-    }
+    os.replace(upload_path, image_path)
+    update_job(job_id, output_path=str(output_path), input_image=str(image_path))
 
     def generate():
         import torch
         try:
             logger.info(f"[{job_id}] Starting I2V generation: {prompt[:50]}...")
-            jobs[job_id]["status"] = "processing"
+            update_job(job_id, status="processing")
 
-            tiling_config = TilingConfig.default()
+            tiling_config = build_tiling_config()
             video_chunks_number = get_video_chunks_number(num_frames, tiling_config)
 
-            video, audio = pipeline(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                seed=seed,
-                height=512,
-                width=768,
-                num_frames=num_frames,
-                frame_rate=25.0,
-                num_inference_steps=40,
-                cfg_guidance_scale=3.0,
-                images=[(str(image_path), 0, 1.0)],
-                tiling_config=tiling_config,
-            )
+            with torch.inference_mode(), compile_stance(512, 768, num_frames):
+                video, audio = pipeline(
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    seed=seed,
+                    height=512,
+                    width=768,
+                    num_frames=num_frames,
+                    frame_rate=25.0,
+                    num_inference_steps=40,
+                    cfg_guidance_scale=3.0,
+                    images=[(str(image_path), 0, 1.0)],
+                    tiling_config=tiling_config,
+                )
 
             # Wrap encoding in no_grad to avoid inference_mode conflict with VAE decoder
             with torch.no_grad():
@@ -257,24 +574,22 @@ async def image_to_video(
                     video_chunks_number=video_chunks_number,
                 )
 
-            jobs[job_id]["status"] = "completed"
+            update_job(job_id, status="completed")
             logger.info(f"[{job_id}] I2V generation completed: {output_path}")
         except Exception as e:
-            jobs[job_id]["status"] = "failed"
-            jobs[job_id]["error"] = str(e)
+            update_job(job_id, status="failed", error=str(e))
             logger.error(f"[{job_id}] I2V generation failed: {e}", exc_info=True)
 
-    background_tasks.add_task(lambda: executor.submit(generate).result())
+    executor.submit(generate)
     return JobStatus(job_id=job_id, status="pending")
 
 
 @app.get("/api/v1/status/{job_id}", response_model=JobStatus)
 async def get_status(job_id: str):
     """Check generation job status."""
-    if job_id not in jobs:
+    job = get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-
-    job = jobs[job_id]
     output_url = None
     if job["status"] == "completed":
         output_url = f"/api/v1/download/{job_id}"
@@ -289,11 +604,16 @@ async def get_status(job_id: str):
 
 @app.get("/api/v1/download/{job_id}")
 async def download_video(job_id: str):
-    """Download generated video."""
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    """Download generated video.
 
-    job = jobs[job_id]
+    Behind nginx, set LTX2_ACCEL_REDIRECT to an internal location so the file
+    is sent by nginx with sendfile, e.g.:
+
+        location /internal/ { internal; alias /home/arthurdell/ltx2_outputs/; }
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail=f"Job status: {job['status']}")
 
@@ -301,40 +621,53 @@ async def download_video(job_id: str):
     if not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Video file not found")
 
+    filename = f"ltx2_{job_id}.mp4"
+    if ACCEL_REDIRECT_PREFIX:
+        return Response(
+            media_type="video/mp4",
+            headers={
+                "X-Accel-Redirect": f"{ACCEL_REDIRECT_PREFIX}{Path(output_path).name}",
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            }
+        )
+
+    # FileResponse sends ETag/Last-Modified and honours Range for resumes
     return FileResponse(
         output_path,
         media_type="video/mp4",
-        filename=f"ltx2_{job_id}.mp4"
+        filename=filename,
+        content_disposition_type="attachment"
     )
 
 
 @app.get("/api/v1/jobs")
-async def list_jobs(limit: int = 20):
+async def list_jobs(limit: int = Query(20, ge=1, le=MAX_LIST_JOBS)):
     """List recent jobs."""
-    recent = list(jobs.items())[-limit:]
+    with db_lock:
+        recent = db.execute(
+            "SELECT job_id, status, error FROM jobs ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
     return {
         "count": len(recent),
-        "jobs": [
-            {"job_id": jid, "status": j["status"], "error": j.get("error")}
-            for jid, j in recent
-        ]
+        "jobs": [dict(j) for j in recent]
     }
 
 
 @app.delete("/api/v1/jobs/{job_id}")
 async def delete_job(job_id: str):
     """Delete a job and its output files."""
-    if job_id not in jobs:
+    job = get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = jobs[job_id]
-
-    if "output_path" in job and os.path.exists(job["output_path"]):
+    if job["output_path"] and os.path.exists(job["output_path"]):
         os.remove(job["output_path"])
-    if "input_image" in job and os.path.exists(job["input_image"]):
+    if job["input_image"] and os.path.exists(job["input_image"]):
         os.remove(job["input_image"])
 
-    del jobs[job_id]
+    with db_lock, db:
+        db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
     return {"status": "deleted", "job_id": job_id}
 
 
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Generate terminal-style typing video with streaming text and blinking cursor."""
 
+import functools
+import math
 import subprocess
+import threading
+import tempfile
+from queue import Queue
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import os
-import tempfile
-import shutil
 
 # Video settings
 WIDTH, HEIGHT = 1920, 1080
@@ -19,6 +24,15 @@ CHARS_PER_SEC = 25
 PAUSE_AFTER_LINE = 0.8  # seconds
 CURSOR_BLINK_RATE = 0.5  # seconds
 
+# Rendering
+RENDER_CHUNK_FRAMES = 10  # frames per block handed to the ffmpeg writer
+# Parallel render+encode processes, one per core by default; TERMINAL_VIDEO_SHARDS
+# overrides it and 1 renders in-process. Capped further in render_video().
+ENCODE_SHARDS = int(os.getenv("TERMINAL_VIDEO_SHARDS", os.cpu_count() or 1))
+MIN_SHARD_FRAMES = FPS * 5  # smallest range worth its own encoder process
+MAX_NVENC_SESSIONS = 3  # concurrent NVENC encoders allowed on consumer GPUs
+WRITE_QUEUE_SIZE = 4  # frame blocks buffered ahead of the ffmpeg writer
+
 # Terminal layout
 LEFT_MARGIN = 60
 TOP_MARGIN = 80
@@ -42,124 +56,334 @@ LINES = [
     ("                                                              patent pending", 20, 0.2),
 ]
 
-def get_font(size):
-    """Get a monospace font."""
-    font_paths = [
-        "/System/Library/Fonts/Menlo.ttc",
-        "/System/Library/Fonts/Monaco.ttf",
-        "/System/Library/Fonts/Courier.dfont",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
-    ]
-    for path in font_paths:
+FONT_PATHS = [
+    "/System/Library/Fonts/Menlo.ttc",
+    "/System/Library/Fonts/Monaco.ttf",
+    "/System/Library/Fonts/Courier.dfont",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+]
+
+def find_font_path():
+    """Return the first candidate font that exists and loads, or None."""
+    for path in FONT_PATHS:
         if os.path.exists(path):
             try:
-                return ImageFont.truetype(path, size)
-            except:
+                ImageFont.truetype(path)
+                return path
+            except OSError:
                 continue
+    return None
+
+FONT_PATH = find_font_path()
+
+@functools.lru_cache(maxsize=None)
+def get_font(size):
+    """Get a monospace font."""
+    if FONT_PATH:
+        return ImageFont.truetype(FONT_PATH, size)
     return ImageFont.load_default()
 
-def generate_frames():
-    """Generate all frames for the video."""
-    frames = []
+def render_text(text, font, color, x_offset=0.0):
+    """Rasterize a glyph run into an RGB array, anchored like ImageDraw.text.
 
-    # Calculate total timeline
-    timeline = []  # [(start_time, end_time, line_idx, char_idx)]
+    Returns (sprite, dx, dy): glyphs with a negative left or top bearing
+    extend past the anchor, so the sprite must be blitted at (x + dx, y + dy).
+    """
+    left, top, right, bottom = font.getbbox(text)
+    dx = min(math.floor(x_offset + left), 0)
+    dy = min(top, 0)
+    size = (max(math.ceil(x_offset + right) - dx, 1), max(bottom - dy, 1))
+    img = Image.new('RGB', size, BG_COLOR)
+    ImageDraw.Draw(img).text((x_offset - dx, -dy), text, font=font, fill=color)
+    return np.asarray(img), dx, dy
+
+@functools.lru_cache(maxsize=None)
+def get_cursor_sprite(size):
+    """Rasterize the block cursor once per font size."""
+    return render_text("█", get_font(size), CURSOR_COLOR)
+
+def blit(dest, sprite, x, y):
+    """Composite a sprite onto dest at (x, y), clipped to the frame."""
+    sx, sy = max(-x, 0), max(-y, 0)
+    x, y = max(x, 0), max(y, 0)
+    h = min(sprite.shape[0] - sy, dest.shape[0] - y)
+    w = min(sprite.shape[1] - sx, dest.shape[1] - x)
+    if h <= 0 or w <= 0:
+        return
+    region = dest[y:y + h, x:x + w]
+    # Text is a single colour on black, so max() matches alpha compositing
+    np.maximum(region, sprite[sy:sy + h, sx:sx + w], out=region)
+
+def build_timeline():
+    """Calculate how many characters of each line are visible on every frame.
+
+    Returns a (total_frames, len(LINES)) int array and the total duration.
+    """
+    line_start = np.zeros(len(LINES))
+    line_len = np.zeros(len(LINES), dtype=int)
     current_time = 0.0
 
     for line_idx, (text, font_size, delay) in enumerate(LINES):
         current_time += delay
+        line_start[line_idx] = current_time
+        line_len[line_idx] = len(text)
         if text:
-            for char_idx in range(len(text) + 1):
-                timeline.append((current_time, line_idx, char_idx))
-                current_time += 1.0 / CHARS_PER_SEC
+            current_time += (len(text) + 1) / CHARS_PER_SEC
         current_time += PAUSE_AFTER_LINE
 
     total_duration = current_time + 2.0  # Extra time at end
     total_frames = int(total_duration * FPS)
 
-    print(f"Generating {total_frames} frames ({total_duration:.1f}s)...")
+    # Characters reveal linearly from each line's start time; the epsilon
+    # keeps frames that land exactly on a character boundary from rounding down
+    t = np.arange(total_frames) / FPS
+    elapsed = (t[:, None] - line_start[None, :]) * CHARS_PER_SEC
+    chars_matrix = np.clip(np.floor(elapsed + 1e-6).astype(int), 0, line_len[None, :])
+    return chars_matrix, total_duration
 
-    # State tracking
-    displayed_chars = [0] * len(LINES)  # chars shown per line
+@functools.lru_cache(maxsize=None)
+def measure_layout():
+    """Measure each line once: y position plus, for every prefix length, the
+    x advance (where the next glyph starts) and the cursor x."""
+    line_y = []
+    text_offsets = []
+    cursor_offsets = []
+    y_pos = TOP_MARGIN
+    for text, font_size, _ in LINES:
+        if font_size == 0:  # blank line
+            line_y.append(y_pos)
+            text_offsets.append(None)
+            cursor_offsets.append(None)
+            y_pos += LINE_HEIGHT // 2
+            continue
+        font = get_font(font_size)
+        line_y.append(y_pos)
+        text_offsets.append([font.getlength(text[:i]) for i in range(len(text) + 1)])
+        cursor_offsets.append([font.getbbox(text[:i])[2] for i in range(len(text) + 1)])
+        y_pos += LINE_HEIGHT
+    return line_y, text_offsets, cursor_offsets
 
-    for frame_num in range(total_frames):
-        current_time = frame_num / FPS
+def render_frames(start_frame, chars_matrix, initial_chars):
+    """Yield a contiguous run of frames in (n, HEIGHT, WIDTH, 3) blocks of up
+    to RENDER_CHUNK_FRAMES.
 
-        # Update displayed characters based on timeline
-        for t, line_idx, char_idx in timeline:
-            if current_time >= t:
-                displayed_chars[line_idx] = max(displayed_chars[line_idx], char_idx)
+    initial_chars is the visible character count per line on the frame before
+    start_frame, so each run can be rendered independently in a worker.
+    Typed text is painted once into a persistent canvas; each frame is a copy
+    of that canvas with the cursor stamped on top.
+    """
+    line_y, text_offsets, cursor_offsets = measure_layout()
 
-        # Create frame
-        img = Image.new('RGB', (WIDTH, HEIGHT), BG_COLOR)
-        draw = ImageDraw.Draw(img)
+    canvas = np.empty((HEIGHT, WIDTH, 3), np.uint8)
+    canvas[:] = BG_COLOR
+    block = None
 
-        y_pos = TOP_MARGIN
-        cursor_x, cursor_y = LEFT_MARGIN, TOP_MARGIN
-        cursor_font_size = 32
-
-        for line_idx, (text, font_size, _) in enumerate(LINES):
-            if font_size == 0:  # blank line
-                y_pos += LINE_HEIGHT // 2
-                continue
+    # State tracking
+    committed_chars = np.zeros(len(LINES), dtype=int)  # chars already painted into canvas
+    active_line = None  # most recent line that has started typing
 
-            font = get_font(font_size)
+    for frame_idx, displayed_chars in enumerate([initial_chars, *chars_matrix], start=-1):
+        # Paint only the newly revealed characters
+        for line_idx in np.flatnonzero(displayed_chars > committed_chars):
+            text, font_size, _ = LINES[line_idx]
             chars_to_show = displayed_chars[line_idx]
-            visible_text = text[:chars_to_show]
+            committed = committed_chars[line_idx]
 
-            if visible_text:
-                draw.text((LEFT_MARGIN, y_pos), visible_text, font=font, fill=TEXT_COLOR)
+            x_pos = LEFT_MARGIN + text_offsets[line_idx][committed]
+            glyphs, dx, dy = render_text(text[committed:chars_to_show], get_font(font_size), TEXT_COLOR, x_pos % 1)
+            blit(canvas, glyphs, int(x_pos) + dx, line_y[line_idx] + dy)
+            committed_chars[line_idx] = chars_to_show
+            active_line = line_idx
 
-                # Calculate cursor position
-                if chars_to_show < len(text) or (chars_to_show == len(text) and line_idx == max(i for i, c in enumerate(displayed_chars) if c > 0 or LINES[i][0] == "")):
-                    bbox = font.getbbox(visible_text)
-                    cursor_x = LEFT_MARGIN + bbox[2]
-                    cursor_y = y_pos
-                    cursor_font_size = font_size
+        if frame_idx < 0:
+            continue
 
-            y_pos += LINE_HEIGHT
+        # Cursor sits at the end of the line currently being typed
+        if active_line is None:
+            cursor_x, cursor_y = LEFT_MARGIN, TOP_MARGIN
+            cursor_font_size = 32
+        else:
+            cursor_x = LEFT_MARGIN + cursor_offsets[active_line][displayed_chars[active_line]]
+            cursor_y = line_y[active_line]
+            cursor_font_size = LINES[active_line][1]
+
+        # Blocks are handed to the ffmpeg writer, so each one is a fresh array
+        block_idx = frame_idx % RENDER_CHUNK_FRAMES
+        if block_idx == 0:
+            block = np.empty((min(RENDER_CHUNK_FRAMES, len(chars_matrix) - frame_idx), HEIGHT, WIDTH, 3), np.uint8)
+        frame = block[block_idx]
+        np.copyto(frame, canvas)
 
         # Draw blinking cursor
+        current_time = (start_frame + frame_idx) / FPS
         cursor_visible = (current_time % CURSOR_BLINK_RATE) < (CURSOR_BLINK_RATE / 2)
         if cursor_visible:
-            cursor_font = get_font(cursor_font_size)
-            draw.text((cursor_x, cursor_y), "█", font=cursor_font, fill=CURSOR_COLOR)
+            sprite, dx, dy = get_cursor_sprite(cursor_font_size)
+            blit(frame, sprite, cursor_x + dx, cursor_y + dy)
+
+        if block_idx == len(block) - 1:
+            yield block
 
-        frames.append(img)
+def generate_frames(chars_matrix, total_duration):
+    """Yield all of the video's frames in order, rendered in-process."""
+    total_frames = len(chars_matrix)
 
-        if frame_num % 100 == 0:
-            print(f"  Frame {frame_num}/{total_frames}")
+    print(f"Generating {total_frames} frames ({total_duration:.1f}s)...")
 
-    return frames, total_duration
+    initial_chars = np.zeros(len(LINES), dtype=int)
+    for block_num, block in enumerate(render_frames(0, chars_matrix, initial_chars)):
+        yield block
+        start = block_num * RENDER_CHUNK_FRAMES
+        if start % 100 == 0:
+            print(f"  Frame {start}/{total_frames}")
 
-def create_video(frames, duration, output_path):
-    """Encode frames to video using ffmpeg."""
-    temp_dir = tempfile.mkdtemp()
+def encode_shard(start_frame, chars_matrix, initial_chars, segment_path):
+    """Render and encode one contiguous shard of the video; runs in a worker."""
+    frames = render_frames(start_frame, chars_matrix, initial_chars)
+    create_video(frames, len(chars_matrix) / FPS, segment_path)
+    return segment_path
+
+def concat_segments(segment_paths, output_path):
+    """Join encoded segments into one file without re-encoding."""
+    list_path = os.path.join(os.path.dirname(segment_paths[0]), "segments.txt")
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{path}'\n")
+
+    cmd = [
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+        "-f", "concat", "-safe", "0",
+        "-i", list_path,
+        "-c", "copy",
+        output_path
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+def render_video(chars_matrix, total_duration, output_path, shards=ENCODE_SHARDS):
+    """Render and encode the video, optionally sharded across processes.
+
+    With more than one shard, each worker renders a contiguous range of
+    frames into its own ffmpeg encoder, so frame data never crosses a process
+    boundary; the encoded segments are then stream-copied into output_path.
+    Rendering is cheap next to encoding, so this only pays off when a single
+    encoder cannot keep every core busy.
+    """
+    if ffmpeg_encoder_args()[1] == "h264_nvenc":
+        shards = min(shards, MAX_NVENC_SESSIONS)
+    total_frames = len(chars_matrix)
+    shards = min(shards, math.ceil(total_frames / MIN_SHARD_FRAMES))
+
+    if shards <= 1:
+        create_video(generate_frames(chars_matrix, total_duration), total_duration, output_path)
+        return
+
+    print(f"Generating {total_frames} frames ({total_duration:.1f}s) in {shards} shards...")
+
+    bounds = np.linspace(0, total_frames, shards + 1).astype(int)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with ProcessPoolExecutor(max_workers=shards) as executor:
+            futures = []
+            for shard, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+                initial_chars = chars_matrix[start - 1] if start else np.zeros(len(LINES), dtype=int)
+                segment_path = os.path.join(temp_dir, f"segment_{shard:03d}.mp4")
+                futures.append(executor.submit(
+                    encode_shard, int(start), chars_matrix[start:end], initial_chars, segment_path
+                ))
+            segment_paths = [future.result() for future in futures]
+
+        concat_segments(segment_paths, output_path)
+    print(f"Video saved to: {output_path}")
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_encoder_args():
+    """Pick the fastest available H.264 encoder: NVENC if present, else libx264.
 
+    ffmpeg builds often list h264_nvenc without a usable GPU or driver, so
+    NVENC is chosen only if it can actually encode a test frame.
+    """
+    probe = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=s=256x256",
+        "-frames:v", "1",
+        "-c:v", "h264_nvenc",
+        "-f", "null", "-"
+    ]
     try:
-        print(f"Saving {len(frames)} frames to temp directory...")
-        for i, frame in enumerate(frames):
-            frame.save(os.path.join(temp_dir, f"frame_{i:05d}.png"))
-
-        print("Encoding video with ffmpeg...")
-        cmd = [
-            "ffmpeg", "-y",
-            "-framerate", str(FPS),
-            "-i", os.path.join(temp_dir, "frame_%05d.png"),
+        subprocess.run(probe, check=True, capture_output=True, timeout=30)
+        return [
+            "-c:v", "h264_nvenc",
+            "-preset", "p1",
+            "-tune", "ll",
+            "-rc", "vbr",
+            "-cq", "19",
+        ]
+    except (OSError, subprocess.SubprocessError):
+        return [
             "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",
-            "-preset", "medium",
+            "-preset", "ultrafast",
+            "-tune", "zerolatency",
             "-crf", "18",
-            output_path
         ]
-        subprocess.run(cmd, check=True, capture_output=True)
-        print(f"Video saved to: {output_path}")
 
+def create_video(frames, duration, output_path):
+    """Encode frames to video by piping raw RGB24 into ffmpeg's stdin.
+
+    A writer thread feeds ffmpeg from a bounded queue so rendering overlaps
+    with pipe writes, while the queue limit provides backpressure.
+    """
+    print("Encoding video with ffmpeg...")
+    cmd = [
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{WIDTH}x{HEIGHT}",
+        "-r", str(FPS),
+        "-i", "-",
+        *ffmpeg_encoder_args(),
+        "-pix_fmt", "yuv420p",
+        output_path
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    blocks = Queue(maxsize=WRITE_QUEUE_SIZE)
+    write_errors = []
+
+    def writer():
+        while (block := blocks.get()) is not None:
+            if write_errors:
+                continue  # keep draining so the producer never blocks
+            try:
+                proc.stdin.write(block)
+            except OSError as e:  # ffmpeg exited early
+                write_errors.append(e)
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+
+    try:
+        for frame in frames:
+            if write_errors:
+                break  # ffmpeg is gone; stop rendering
+            blocks.put(np.ascontiguousarray(frame))
     finally:
-        shutil.rmtree(temp_dir)
+        blocks.put(None)
+        thread.join()
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # reported via the return code below
+        stderr = proc.stderr.read()
+        proc.wait()
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    if write_errors:
+        raise write_errors[0]
+    print(f"Video saved to: {output_path}")
 
 if __name__ == "__main__":
     output_path = "/Volumes/STUDIO/VIDEO/redteam_terminal_v2.mp4"
-    frames, duration = generate_frames()
-    create_video(frames, duration, output_path)
+    chars_matrix, duration = build_timeline()
+    render_video(chars_matrix, duration, output_path)
     print("Done!")